@@ -28,4 +28,5 @@ MAX_TASK_COUNT = 100
 FOLDER_NAME = "General"
 USERNAME = "SvcRpaMBU002"
 SITE_NAME = "MBU-RPA-Egenbefordring"
-TMP_PATH = "C:\\tmp\\Egen_befordring"
+# Files larger than this are uploaded to SharePoint in chunks of this size.
+SHAREPOINT_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
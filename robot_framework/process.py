@@ -1,10 +1,8 @@
 """This module contains the main process of the robot."""
-import os
-import json
-import shutil
+import functools
+import io
 from datetime import datetime, timedelta
-import time
-import locale
+import orjson
 import pandas as pd
 import pyodbc
 from OpenOrchestrator.orchestrator_connection.connection import OrchestratorConnection
@@ -20,39 +18,31 @@ def process(orchestrator_connection: OrchestratorConnection) -> None:
     creds = orchestrator_connection.get_credential(config.USERNAME)
     conn_str = orchestrator_connection.get_constant('DbConnectionString').value
 
-    orchestrator_connection.log_trace("Create tmp-folder.")
-    if not os.path.exists(config.TMP_PATH):
-        os.makedirs(config.TMP_PATH)
-        while not os.path.exists(config.TMP_PATH):
-            time.sleep(1)
-
     orchestrator_connection.log_trace("Export data from hub in SQL database.")
-    file = export_egenbefordring_from_hub(conn_str, config.TMP_PATH, number_of_weeks=1)
+    file_name, file_content = export_egenbefordring_from_hub(conn_str, number_of_weeks=1)
 
-    orchestrator_connection.log_trace(f"Upload file to sharepoint: {file}")
-    upload_file_to_sharepoint(config.FOLDER_NAME, file, creds)
+    if file_content is None:
+        orchestrator_connection.log_info("No Egenbefordring data found for the week. Nothing to upload.")
+        return
 
-    orchestrator_connection.log_trace("Remove tmp-folder.")
-    shutil.rmtree(config.TMP_PATH)
+    orchestrator_connection.log_trace(f"Upload file to sharepoint: {file_name}")
+    upload_file_to_sharepoint(config.FOLDER_NAME, file_name, file_content, creds)
 
 
-def get_week_dates(number_of_weeks: int = None):
+def get_week_dates(today: datetime):
     """
-    Returns the start and end dates of the current week.
+    Returns the start and end dates of the week containing the given day.
 
     The week is considered to start on Monday at 00:00:00 and end on Sunday at 23:59:59.
-    If number_of_weeks is provided, it adjusts the current date by subtracting the specified number of weeks.
 
     Args:
-        number_of_weeks (int, optional): Number of weeks to subtract from the current date.
+        today (datetime): The day whose week is computed.
 
     Returns:
         tuple: A tuple containing two datetime objects:
-               - start_of_week: the start of the current week (Monday)
-               - end_of_week: the end of the current week (Sunday)
+               - start_of_week: the start of the week (Monday)
+               - end_of_week: the end of the week (Sunday)
     """
-    locale.setlocale(locale.LC_TIME, 'da_DK.UTF-8')
-    today = datetime.now() - timedelta(weeks=number_of_weeks) if number_of_weeks else datetime.now()
     start_of_week = today - timedelta(days=today.weekday())
     start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
     end_of_week = start_of_week + timedelta(days=6, seconds=86399)
@@ -60,26 +50,96 @@ def get_week_dates(number_of_weeks: int = None):
     return start_of_week, end_of_week
 
 
-def export_egenbefordring_from_hub(connection_string: str, temp_path: str, number_of_weeks: int = None):
+@functools.lru_cache(maxsize=1)
+def _connect_to_hub(connection_string: str) -> pyodbc.Connection:
+    """Opens and caches a pyodbc connection to the Hub database."""
+    return pyodbc.connect(connection_string)
+
+
+def get_hub_connection(connection_string: str) -> pyodbc.Connection:
+    """
+    Returns a pyodbc connection to the Hub database.
+
+    The connection is cached, so retries within the same robot process reuse
+    the existing connection instead of reconnecting and re-authenticating.
+    A cheap liveness check runs before reuse; if the cached connection has
+    dropped, it is discarded and a new one is opened.
+
+    Args:
+        connection_string (str): The database connection string.
+
+    Returns:
+        pyodbc.Connection: An open connection to the Hub database.
+    """
+    conn = _connect_to_hub(connection_string)
+    try:
+        conn.execute("SELECT 1").fetchone()
+    except pyodbc.Error:
+        _connect_to_hub.cache_clear()
+        conn = _connect_to_hub(connection_string)
+    return conn
+
+
+@functools.lru_cache(maxsize=1)
+def _create_sharepoint_client(username: str, password: str, site_url: str, site_name: str, document_library: str) -> Sharepoint:
+    """Creates and caches a Sharepoint client."""
+    return Sharepoint(username=username, password=password, site_url=site_url, site_name=site_name, document_library=document_library)
+
+
+def get_sharepoint_client(username: str, password: str, site_url: str, site_name: str, document_library: str) -> Sharepoint:
     """
-    Retrieves 'Egenbefordring' data for the current week from the database and exports it to an Excel file.
+    Returns an authenticated Sharepoint client.
+
+    The client is cached, so retries within the same robot process reuse the
+    authenticated session instead of logging in to SharePoint again. The
+    wrapper sets its client context to None when authentication fails, so a
+    client without a context is discarded and authentication is retried
+    instead of keeping a broken client cached.
+
+    Args:
+        username (str): Username for authentication.
+        password (str): Password for authentication.
+        site_url (str): URL of the SharePoint site.
+        site_name (str): Name of the SharePoint site.
+        document_library (str): Document library path.
+
+    Returns:
+        Sharepoint: An authenticated Sharepoint client.
+    """
+    sp = _create_sharepoint_client(username, password, site_url, site_name, document_library)
+    if sp.ctx is None:
+        _create_sharepoint_client.cache_clear()
+        sp = _create_sharepoint_client(username, password, site_url, site_name, document_library)
+    return sp
+
+
+def export_egenbefordring_from_hub(connection_string: str, number_of_weeks: int = None):
+    """
+    Retrieves 'Egenbefordring' data for the current week from the database and exports it to an in-memory Excel file.
 
     Args:
         connection_string (str): The database connection string.
-        temp_path (str): The path where the Excel file will be saved.
+        number_of_weeks (int, optional): Number of weeks to subtract from the current date.
+
+    Returns:
+        tuple: The file name for the export and the binary content of the Excel file.
+               The content is None when the week has no rows.
 
     The function performs the following steps:
         - Retrieves the start and end dates for the current week.
         - Queries the database for records that fall within the week.
         - Normalizes and formats the JSON data retrieved.
-        - Exports the normalized data to an Excel file with the current week's details.
+        - Exports the normalized data to an in-memory Excel file with the current week's details.
     """
-    current_week_start, current_week_end = get_week_dates(number_of_weeks=number_of_weeks)
+    now = datetime.now()
+    today = now - timedelta(weeks=number_of_weeks) if number_of_weeks else now
+    current_week_start, current_week_end = get_week_dates(today)
     start_date = current_week_start.strftime('%Y-%m-%d %H:%M:%S')
     end_date = current_week_end.strftime('%Y-%m-%d %H:%M:%S')
-    current_week_number = datetime.date(datetime.now() - timedelta(weeks=number_of_weeks) if number_of_weeks else datetime.now()).isocalendar()[1]
+    current_week = today.isocalendar()
+    current_week_number = current_week.week
     date_filename = f"{current_week_number}_{current_week_start.strftime('%d%m%Y')}_{current_week_end.strftime('%d%m%Y')}"
-    xl_sheetname = f"{current_week_number}_{datetime.now().year}"
+    xl_sheetname = f"{current_week_number}_{current_week.year}"
 
     add_columns = {
         'aendret_beloeb_i_alt': [],
@@ -92,57 +152,65 @@ def export_egenbefordring_from_hub(connection_string: str, temp_path: str, numbe
     remove_columns = ['koerselsliste_tomme_felter_tjek_']
     move_columns_to_last = ['test', 'attachments', 'uuid']
 
-    conn = pyodbc.connect(connection_string)
+    conn = get_hub_connection(connection_string)
     cursor = conn.cursor()
 
-    query = f"""
+    query = """
     SELECT  reference,
-            CASE
-                WHEN JSON_VALUE(data, '$.completed') IS NOT NULL THEN JSON_VALUE(data, '$.completed')
-                ELSE JSON_VALUE(data, '$.entity.completed[0].value')
-            END as [modtagelsesdato],
+            CONVERT(varchar(19),
+                TRY_CONVERT(datetimeoffset,
+                    CASE
+                        WHEN JSON_VALUE(data, '$.completed') IS NOT NULL THEN JSON_VALUE(data, '$.completed')
+                        ELSE JSON_VALUE(data, '$.entity.completed[0].value')
+                    END), 120) as [modtagelsesdato],
             data
     FROM    rpa.Hub_GO_Egenbefordring_ifm_til_skolekoer
     WHERE   (
-                TRY_CAST(JSON_Value(data, '$.completed') AS DATETIMEOFFSET) >= '{start_date}'
-                AND TRY_CAST(JSON_Value(data, '$.completed') AS DATETIMEOFFSET) <= '{end_date}'
+                TRY_CAST(JSON_Value(data, '$.completed') AS DATETIMEOFFSET) >= ?
+                AND TRY_CAST(JSON_Value(data, '$.completed') AS DATETIMEOFFSET) <= ?
             )
             OR (
-                TRY_CAST(JSON_Value(data, '$.entity.completed[0].value') AS DATETIMEOFFSET) >= '{start_date}'
-                AND TRY_CAST(JSON_Value(data, '$.entity.completed[0].value') AS DATETIMEOFFSET) <= '{end_date}'
+                TRY_CAST(JSON_Value(data, '$.entity.completed[0].value') AS DATETIMEOFFSET) >= ?
+                AND TRY_CAST(JSON_Value(data, '$.entity.completed[0].value') AS DATETIMEOFFSET) <= ?
             )
     """
-    print(query)
-    cursor.execute(query)
-    result = cursor.fetchall()
-
-    file_name = rf"{temp_path}\Egenbefordring_{date_filename}.xlsx"
-
-    for row in result:
-        uuid = row.reference
-        received_date = row.modtagelsesdato
-        datetime_obj = datetime.fromisoformat(received_date)
-        formatted_datetime_str = datetime_obj.strftime("%Y-%m-%d %H:%M:%S")
-        json_data = json.loads(row.data)
-        json_data_normalized = pd.json_normalize(json_data['data'], sep='_', max_level=0)
-        json_data_normalized['modtagelsesdato'] = formatted_datetime_str
-        json_data_normalized['uuid'] = uuid
-        export_to_excel(file_name, f"{xl_sheetname}", json_data_normalized, add_columns, remove_columns, move_columns_to_last)
+    cursor.execute(query, start_date, end_date, start_date, end_date)
+
+    file_name = f"Egenbefordring_{date_filename}.xlsx"
+
+    records = []
+    while True:
+        rows = cursor.fetchmany(1000)
+        if not rows:
+            break
+        for row in rows:
+            json_data = orjson.loads(row.data)
+            record = dict(json_data['data'])
+            record['modtagelsesdato'] = row.modtagelsesdato
+            record['uuid'] = row.reference
+            records.append(record)
 
     cursor.close()
-    conn.close()
 
-    return file_name
+    if not records:
+        return file_name, None
+
+    dataframe_data = pd.DataFrame.from_records(records)
+    buffer = io.BytesIO()
+    export_to_excel(buffer, f"{xl_sheetname}", dataframe_data, add_columns, remove_columns, move_columns_to_last)
+
+    return file_name, buffer.getvalue()
 
 
-def upload_file_to_sharepoint(folder_name: str, file: str, credentials):
+def upload_file_to_sharepoint(folder_name: str, file_name: str, file_content: bytes, credentials):
     """
     Uploads a file to a specified folder within a SharePoint site.
 
     Args:
         folder_name (str): The name of the folder within the SharePoint
                             document library where the file will be uploaded.
-        file (str): The local path to the file that needs to be uploaded.
+        file_name (str): The name to give the file in SharePoint.
+        file_content (bytes): The binary content of the file to upload.
         credentials: An object containing 'username' and 'password' attributes
                         for SharePoint authentication.
 
@@ -156,8 +224,13 @@ def upload_file_to_sharepoint(folder_name: str, file: str, credentials):
         "site_name": f"{config.SITE_NAME}",
         "document_library": "Delte dokumenter"
     }
-    sp = Sharepoint(**sharepoint_details)
-    sp.upload_file(folder_name, file)
+    sp = get_sharepoint_client(**sharepoint_details)
+    if len(file_content) > config.SHAREPOINT_UPLOAD_CHUNK_SIZE:
+        folder_url = f"/teams/{config.SITE_NAME}/{sharepoint_details['document_library']}/{folder_name}"
+        target_folder = sp.ctx.web.get_folder_by_server_relative_url(folder_url)
+        target_folder.files.create_upload_session(io.BytesIO(file_content), chunk_size=config.SHAREPOINT_UPLOAD_CHUNK_SIZE, file_name=file_name).execute_query()
+    else:
+        sp.upload_file_from_bytes(file_content, file_name, folder_name)
 
 
 if __name__ == "__main__":
@@ -1,36 +1,27 @@
 """
 This module provides functionalities to export pandas DataFrames to an Excel file.
-It uses the openpyxl library to either append data to an existing sheet or create
-a new sheet if the file does not exist.
+It uses the xlsxwriter library to write the data to a new file in a single pass.
 """
-import os
 import pandas as pd
-import openpyxl
-from openpyxl.utils.dataframe import dataframe_to_rows
 
 
 def export_to_excel(filepath, sheetname, dataframe_data, add_columns=None, remove_columns=None, move_columns_to_last=None):
     """
-    Exports a pandas DataFrame to an Excel file. If the file exists, it appends the data to the specified sheet.
-    If the file does not exist, it creates a new Excel file with the data.
+    Exports a pandas DataFrame to an Excel file in a single write.
 
     Args:
-        filepath (str): The path to the Excel file.
-        sheetname (str): The name of the sheet to append the data to.
+        filepath (str or io.BytesIO): The path or buffer to write the Excel file to.
+        sheetname (str): The name of the sheet to write the data to.
         dataframe_data (pd.DataFrame): The pandas DataFrame containing the data to export.
         add_columns (dict, optional): Dictionary of columns to add, where keys are column names and values are the data for the columns.
         remove_columns (list, optional): List of column names to remove from the DataFrame.
         move_columns_to_last (list, optional): List of column names to move to the last position.
 
     Raises:
-        ValueError: If the sheet name does not exist in the existing workbook or if the lengths of add_columns values do not match the DataFrame length.
+        ValueError: If the lengths of add_columns values do not match the DataFrame length.
     """
     dataframe_data = modify_dataframe(dataframe_data, add_columns, remove_columns, move_columns_to_last)
-
-    if os.path.isfile(filepath):
-        append_to_existing_sheet(filepath, sheetname, dataframe_data)
-    else:
-        create_new_excel(filepath, sheetname, dataframe_data)
+    write_workbook(filepath, sheetname, dataframe_data)
 
 
 def modify_dataframe(dataframe_data, add_columns=None, remove_columns=None, move_columns_to_last=None):
@@ -47,61 +38,43 @@ def modify_dataframe(dataframe_data, add_columns=None, remove_columns=None, move
         pd.DataFrame: Modified DataFrame.
     """
     if add_columns:
+        new_columns = {}
         for col_name, col_data in add_columns.items():
             if len(col_data) == 0:
                 col_data = [None] * len(dataframe_data)
             if len(col_data) != len(dataframe_data):
                 raise ValueError(f"Length of values for column '{col_name}' ({len(col_data)}) does not match length of DataFrame ({len(dataframe_data)}).")
-            dataframe_data[col_name] = col_data
+            new_columns[col_name] = col_data
+        dataframe_data = dataframe_data.assign(**new_columns)
 
     if remove_columns:
         dataframe_data.drop(columns=remove_columns, inplace=True)
 
     if move_columns_to_last:
         for col in move_columns_to_last:
-            if col in dataframe_data.columns:
-                cols = list(dataframe_data.columns)
-                cols.append(cols.pop(cols.index(col)))
-                dataframe_data = dataframe_data[cols]
-            else:
+            if col not in dataframe_data.columns:
                 raise ValueError(f"The column '{col}' does not exist in the DataFrame.")
+        moving = set(move_columns_to_last)
+        remaining_columns = [col for col in dataframe_data.columns if col not in moving]
+        dataframe_data = dataframe_data.reindex(columns=remaining_columns + list(move_columns_to_last))
 
     return dataframe_data
 
 
-def append_to_existing_sheet(filepath, sheetname, dataframe_data):
-    """
-    Appends data to an existing sheet in an Excel file.
-
-    Args:
-        filepath (str): The path to the Excel file.
-        sheetname (str): The name of the sheet to append the data to.
-        dataframe_data (pd.DataFrame): The pandas DataFrame containing the data to append.
-
-    Raises:
-        ValueError: If the sheet name does not exist in the existing workbook.
+def write_workbook(filepath, sheetname, dataframe_data):
     """
-    workbook = openpyxl.load_workbook(filepath)
-    if sheetname not in workbook.sheetnames:
-        raise ValueError(f"The sheet name '{sheetname}' does not exist in the workbook.")
-
-    sheet = workbook[sheetname]
-    for row in dataframe_to_rows(dataframe_data, header=False, index=False):
-        row = [str(cell) if cell is not None else "" for cell in row]
-        sheet.append(row)
-
-    workbook.save(filepath)
-    workbook.close()
+    Writes a DataFrame to a new Excel file using the xlsxwriter engine.
 
-
-def create_new_excel(filepath, sheetname, dataframe_data):
-    """
-    Creates a new Excel file with the provided data.
+    The whole DataFrame is written in one pass. constant_memory mode is
+    deliberately not used: pandas writes cells column-by-column, and
+    constant_memory silently discards writes to already flushed rows, which
+    blanks every column after the first.
 
     Args:
-        filepath (str): The path to the Excel file.
+        filepath (str or io.BytesIO): The path or buffer to write the Excel file to.
         sheetname (str): The name of the sheet to create.
         dataframe_data (pd.DataFrame): The pandas DataFrame containing the data to export.
     """
-    with pd.ExcelWriter(path=filepath, engine='openpyxl') as writer:  # pylint: disable=abstract-class-instantiated
+    engine_options = {'strings_to_urls': False}
+    with pd.ExcelWriter(path=filepath, engine='xlsxwriter', engine_kwargs={'options': engine_options}) as writer:
         dataframe_data.to_excel(writer, index=False, sheet_name=sheetname)
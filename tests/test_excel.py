@@ -0,0 +1,47 @@
+"""Tests for the Excel export sub-process."""
+import io
+
+import pandas as pd
+
+from robot_framework.sub_processes.excel import export_to_excel
+
+
+def test_export_to_excel_round_trip():
+    """Every cell of every row must survive the export unchanged."""
+    dataframe_data = pd.DataFrame({
+        'reference': ['a', 'b', 'c'],
+        'beloeb': [10.5, 20.0, 30.25],
+        'modtagelsesdato': ['2026-01-05 08:00:00', '2026-01-06 09:30:00', '2026-01-07 10:15:00'],
+    })
+
+    buffer = io.BytesIO()
+    export_to_excel(buffer, 'uge_2_2026', dataframe_data)
+
+    result = pd.read_excel(io.BytesIO(buffer.getvalue()), sheet_name='uge_2_2026')
+    assert result['reference'].tolist() == ['a', 'b', 'c']
+    assert result['beloeb'].tolist() == [10.5, 20.0, 30.25]
+    assert result['modtagelsesdato'].tolist() == ['2026-01-05 08:00:00', '2026-01-06 09:30:00', '2026-01-07 10:15:00']
+
+
+def test_export_to_excel_modifies_columns():
+    """Added, removed and moved columns must come back in the expected order."""
+    dataframe_data = pd.DataFrame({
+        'reference': ['a', 'b'],
+        'koerselsliste_tomme_felter_tjek_': ['x', 'y'],
+        'uuid': ['1', '2'],
+    })
+
+    buffer = io.BytesIO()
+    export_to_excel(
+        buffer,
+        'uge_2_2026',
+        dataframe_data,
+        add_columns={'godkendt': []},
+        remove_columns=['koerselsliste_tomme_felter_tjek_'],
+        move_columns_to_last=['uuid'],
+    )
+
+    result = pd.read_excel(io.BytesIO(buffer.getvalue()), sheet_name='uge_2_2026')
+    assert result.columns.tolist() == ['reference', 'godkendt', 'uuid']
+    assert result['reference'].tolist() == ['a', 'b']
+    assert result['uuid'].tolist() == [1, 2]